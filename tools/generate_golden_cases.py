@@ -1,11 +1,16 @@
 #!/usr/bin/env python3
+import functools
+import importlib.util
+import io
 import json
 import math
 import os
 import re
 import sys
-import hashlib
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import sha256 as _sha256
+from itertools import islice
 
 REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 WORKSPACE_ROOT = os.path.dirname(REPO_ROOT)
@@ -13,6 +18,11 @@ DATA_DIR = os.path.join(WORKSPACE_ROOT, "tests", "data")
 TESTS_DIR = os.path.join(WORKSPACE_ROOT, "tests")
 MUTAGEN_DIR = os.path.join(WORKSPACE_ROOT, "mutagen")
 OUTPUT_DIR = os.path.join(REPO_ROOT, "Example", "Tests", "Fixtures", "golden")
+CACHE_DIR = os.path.join(OUTPUT_DIR, ".cache")
+
+# Golden files are read by the Swift tests, so they are written compact unless
+# GOLDEN_PRETTY is set for a human-readable diff.
+PRETTY = bool(os.environ.get("GOLDEN_PRETTY"))
 
 INCLUDED_TEST_FILES = {
     "test_mp3.py", "test_id3.py", "test_flac.py", "test_mp4.py", "test_wave.py",
@@ -23,94 +33,108 @@ INCLUDED_TEST_FILES = {
     "test_oggflac.py", "test_smf.py",
 }
 
+_EXT_TO_FORMAT = {
+    "mp3": "mp3",
+    "flac": "flac",
+    "m4a": "m4a", "m4b": "m4a", "m4p": "m4a", "3g2": "m4a",
+    "mp4": "mp4",
+    "wav": "wave", "wave": "wave",
+    "aif": "aiff", "aiff": "aiff", "aifc": "aiff",
+    "asf": "asf", "wma": "asf",
+    "apev2": "apev2",
+    "mpc": "musepack",
+    "wv": "wavpack",
+    "tak": "tak",
+    "dsf": "dsf",
+    "dff": "dsdiff", "dsdiff": "dsdiff",
+    "aac": "aac",
+    "ac3": "ac3",
+    "eac3": "eac3",
+    "ogg": "ogg", "oga": "ogg", "opus": "ogg", "spx": "ogg",
+    "oggtheora": "ogg", "oggflac": "ogg", "ogv": "ogg",
+    "tta": "trueAudio",
+    "ofr": "optimFrog", "ofs": "optimFrog",
+    "mid": "smf", "smf": "smf",
+    "ape": "monkeysAudio",
+    "id3": "id3",
+}
+
 sys.path.insert(0, WORKSPACE_ROOT)
 sys.path.insert(0, MUTAGEN_DIR)
 
-try:
-    import mutagen  # type: ignore
-except Exception as exc:  # pragma: no cover
-    raise SystemExit(f"failed to import mutagen from {MUTAGEN_DIR}: {exc}")
+
+@functools.lru_cache(maxsize=None)
+def _mutagen():
+    # Imported on first use: only processes that actually parse a fixture
+    # (cache misses, in the pool workers) load mutagen.
+    try:
+        import mutagen  # type: ignore
+    except Exception as exc:  # pragma: no cover
+        raise SystemExit(f"failed to import mutagen from {MUTAGEN_DIR}: {exc}")
+    return mutagen
+
+
+# Every os.path.join(DATA_DIR, "...") reference also matches the bare form, and
+# a pattern that starts with a literal lets re skip ahead to "DATA_DIR" hits
+# instead of trying the match at every offset.
+_REF_RE = re.compile(rb"DATA_DIR\s*,\s*['\"]([^'\"]+)['\"]")
+
+# open() sizes its buffer from st_blksize, which some network filesystems
+# report as something tiny; pin it so mutagen's many small reads stay cheap.
+# Fixtures are deliberately not mmapped: mutagen copies every read() into
+# bytes anyway, and an mmap-backed file object measured slower than this.
+_READ_BUFFERING = max(io.DEFAULT_BUFFER_SIZE, 4096)
 
 
 def parse_referenced_files():
     mapping = defaultdict(list)
     found = set()
 
-    patterns = [
-        re.compile(r"os\.path\.join\(DATA_DIR,\s*['\"]([^'\"]+)['\"]\)"),
-        re.compile(r"DATA_DIR\s*,\s*['\"]([^'\"]+)['\"]"),
-    ]
+    # One directory listing up front instead of a stat per referenced name.
+    # It only covers the top level, so nested names still get an isfile check.
+    try:
+        with os.scandir(DATA_DIR) as entries:
+            existing = frozenset(e.name for e in entries if e.is_file())
+    except (FileNotFoundError, NotADirectoryError):
+        existing = frozenset()
 
     for test_file in sorted(INCLUDED_TEST_FILES):
         path = os.path.join(TESTS_DIR, test_file)
         if not os.path.exists(path):
             continue
-        with open(path, "r", encoding="utf-8") as f:
-            text = f.read()
-
-        for pat in patterns:
-            for m in pat.finditer(text):
-                name = m.group(1)
-                if name in ("does",):
-                    continue
-                abs_path = os.path.join(DATA_DIR, name)
-                if os.path.isfile(abs_path):
-                    found.add(name)
-                    mapping[name].append(test_file)
+        with open(path, "rb") as f:
+            data = f.read()
+        if b"DATA_DIR" not in data:
+            continue
+
+        for m in _REF_RE.finditer(data):
+            name = m.group(1).decode("utf-8")
+            if name in ("does",):
+                continue
+            if "/" in name or os.sep in name:
+                is_fixture = os.path.isfile(os.path.join(DATA_DIR, name))
+            else:
+                is_fixture = name in existing
+            if is_fixture:
+                found.add(name)
+                mapping[name].append(test_file)
 
     return sorted(found), mapping
 
 
 def format_from_filename(name: str):
     ext = os.path.splitext(name)[1].lower().lstrip(".")
-    if ext == "mp3":
-        return "mp3"
-    if ext == "flac":
-        return "flac"
-    if ext in {"m4a", "m4b", "m4p", "mp4", "3g2"}:
-        return "m4a" if ext in {"m4a", "m4b", "m4p", "3g2"} else "mp4"
-    if ext in {"wav", "wave"}:
-        return "wave"
-    if ext in {"aif", "aiff", "aifc"}:
-        return "aiff"
-    if ext in {"asf", "wma"}:
-        return "asf"
-    if ext in {"apev2"}:
-        return "apev2"
-    if ext in {"mpc"}:
-        return "musepack"
-    if ext in {"wv"}:
-        return "wavpack"
-    if ext in {"tak"}:
-        return "tak"
-    if ext in {"dsf"}:
-        return "dsf"
-    if ext in {"dff", "dsdiff"}:
-        return "dsdiff"
-    if ext in {"aac"}:
-        return "aac"
-    if ext in {"ac3"}:
-        return "ac3"
-    if ext in {"eac3"}:
-        return "eac3"
-    if ext in {"ogg", "oga", "opus", "spx", "oggtheora", "oggflac", "ogv"}:
-        return "ogg"
-    if ext in {"tta"}:
-        return "trueAudio"
-    if ext in {"ofr", "ofs"}:
-        return "optimFrog"
-    if ext in {"mid", "smf"}:
-        return "smf"
-    if ext in {"ape"}:
-        return "monkeysAudio"
-    if ext in {"id3"}:
-        return "id3"
-    return "unknown"
+    return _EXT_TO_FORMAT.get(ext, "unknown")
 
 
 def safe_number(value):
     if value is None:
         return None
+    t = type(value)
+    if t is int or t is bool:
+        return value
+    if t is float:
+        return value if math.isfinite(value) else None
     if isinstance(value, bool):
         return value
     if isinstance(value, int):
@@ -130,96 +154,140 @@ def safe_number(value):
     return None
 
 
-def normalize_tag_value(value):
-    if hasattr(value, "imageformat"):
-        raw = bytes(value)
+def _binary_value(raw):
+    return {
+        "kind": "binary",
+        "value": {
+            "size": len(raw),
+            "sha256": _sha256(raw, usedforsecurity=False).hexdigest(),
+        },
+    }
+
+
+def _normalize_text(value):
+    text = str(value)
+    if text:
+        return {"kind": "text", "value": [text]}
+    return None
+
+
+def _normalize_bool(value):
+    return {"kind": "bool", "value": value}
+
+
+def _normalize_int(value):
+    return {"kind": "int", "value": value}
+
+
+def _normalize_float(value):
+    if math.isfinite(value):
+        return {"kind": "double", "value": value}
+    return _normalize_text(value)
+
+
+def _normalize_sequence(value):
+    if value and all(isinstance(x, (bytes, bytearray, memoryview)) for x in value):
+        digest = _sha256(usedforsecurity=False)
+        size = 0
+        for x in value:
+            # memoryviews may be non-contiguous or multi-byte; copy those.
+            chunk = bytes(x) if isinstance(x, memoryview) else x
+            digest.update(chunk)
+            size += len(chunk)
         return {
             "kind": "binary",
-            "value": {
-                "size": len(raw),
-                "sha256": hashlib.sha256(raw).hexdigest(),
-            },
+            "value": {"size": size, "sha256": digest.hexdigest()},
         }
+    if all(isinstance(x, (str, bytes, int, float, bool)) for x in value):
+        converted = []
+        for x in value:
+            if isinstance(x, bytes):
+                converted.append(x.decode("utf-8", "replace"))
+            else:
+                converted.append(str(x))
+        return {"kind": "text", "value": converted}
+    return _normalize_text(value)
+
+
+# Exact builtin types never carry mutagen's imageformat/text attributes, so
+# they can be dispatched before the duck-typed checks. Insertion order keeps
+# bool ahead of int for the isinstance fallback below.
+_NORMALIZERS = {
+    bool: _normalize_bool,
+    int: _normalize_int,
+    float: _normalize_float,
+    bytes: _binary_value,
+    list: _normalize_sequence,
+    tuple: _normalize_sequence,
+}
+
+_MISSING = object()
 
-    if hasattr(value, "text"):
+
+def normalize_tag_value(value):
+    normalizer = _NORMALIZERS.get(type(value))
+    if normalizer is not None:
+        return normalizer(value)
+
+    if getattr(value, "imageformat", _MISSING) is not _MISSING:
+        return _binary_value(bytes(value))
+
+    text = getattr(value, "text", _MISSING)
+    if text is not _MISSING:
         try:
-            texts = [str(x) for x in value.text]
+            texts = [str(x) for x in text]
             return {"kind": "text", "value": texts}
         except Exception:
             pass
 
-    if isinstance(value, bytes):
-        return {
-            "kind": "binary",
-            "value": {
-                "size": len(value),
-                "sha256": hashlib.sha256(value).hexdigest(),
-            },
-        }
+    for base, normalizer in _NORMALIZERS.items():
+        if isinstance(value, base):
+            return normalizer(value)
 
-    if isinstance(value, (list, tuple)):
-        if value and all(isinstance(x, (bytes, bytearray, memoryview)) for x in value):
-            blobs = [bytes(x) for x in value]
-            joined = b"".join(blobs)
-            return {
-                "kind": "binary",
-                "value": {
-                    "size": len(joined),
-                    "sha256": hashlib.sha256(joined).hexdigest(),
-                },
-            }
-        if all(isinstance(x, (str, bytes, int, float, bool)) for x in value):
-            converted = []
-            for x in value:
-                if isinstance(x, bytes):
-                    converted.append(x.decode("utf-8", "replace"))
-                else:
-                    converted.append(str(x))
-            return {"kind": "text", "value": converted}
+    return _normalize_text(value)
 
-    if isinstance(value, bool):
-        return {"kind": "bool", "value": value}
 
-    if isinstance(value, int):
-        return {"kind": "int", "value": value}
+_WANTED_PREFIXES = (
+    "T", "TITLE", "ARTIST", "ALBUM", "GENRE", "COMMENT",
+    "\\xa9", "covr", "trkn", "disk", "tmpo", "cpil", "purl",
+)
+_WANTED_UPPER = frozenset({"TITLE", "ARTIST", "ALBUM", "GENRE", "COMMENT"})
 
-    if isinstance(value, float):
-        if math.isfinite(value):
-            return {"kind": "double", "value": value}
+# Keys only need testing against the prefixes that share their first char.
+_PREFIXES_BY_FIRST_CHAR = {}
+for _prefix in _WANTED_PREFIXES:
+    _PREFIXES_BY_FIRST_CHAR[_prefix[0]] = _PREFIXES_BY_FIRST_CHAR.get(_prefix[0], ()) + (_prefix,)
+del _prefix
 
-    text = str(value)
-    if text:
-        return {"kind": "text", "value": [text]}
-
-    return None
+_EXT_ATTRS = (
+    "version", "layer", "bitrate_mode", "encoder_info", "codec",
+    "codec_name", "codec_description", "track_gain", "track_peak",
+    "album_gain", "album_peak", "title_gain", "title_peak",
+)
 
 
 def collect_tags(audio):
     tags = {}
-    wanted_prefixes = (
-        "T", "TITLE", "ARTIST", "ALBUM", "GENRE", "COMMENT",
-        "\\xa9", "covr", "trkn", "disk", "tmpo", "cpil", "purl",
-    )
 
     source = getattr(audio, "tags", None)
     if source is None:
         return tags
 
     items = []
-    if hasattr(source, "items"):
+    source_items = getattr(source, "items", _MISSING)
+    if source_items is not _MISSING:
         try:
-            items = list(source.items())
+            items = list(islice(source_items(), 120))
         except Exception:
             items = []
 
-    for key, value in items[:120]:
+    for key, value in items:
         key_str = str(key)
         if not key_str:
             continue
-        if not key_str.startswith(wanted_prefixes):
-            upper = key_str.upper()
-            if upper not in {"TITLE", "ARTIST", "ALBUM", "GENRE", "COMMENT"}:
-                continue
+        prefixes = _PREFIXES_BY_FIRST_CHAR.get(key_str[0], ())
+        if not key_str.startswith(prefixes) and key_str.upper() not in _WANTED_UPPER:
+            continue
         normalized = normalize_tag_value(value)
         if normalized:
             tags[key_str] = normalized
@@ -233,34 +301,24 @@ def collect_extensions(audio):
     if info is None:
         return ext
 
-    attrs = [
-        "version", "layer", "bitrate_mode", "encoder_info", "codec",
-        "codec_name", "codec_description", "track_gain", "track_peak",
-        "album_gain", "album_peak", "title_gain", "title_peak",
-    ]
-    for name in attrs:
-        if hasattr(info, name):
-            value = getattr(info, name)
-            if value is None:
-                continue
-            if isinstance(value, (int, bool)):
-                ext[name] = {"kind": "int", "value": int(value)}
-            elif isinstance(value, float):
-                if math.isfinite(value):
-                    ext[name] = {"kind": "double", "value": float(value)}
-            else:
-                ext[name] = {"kind": "text", "value": [str(value)]}
+    for name in _EXT_ATTRS:
+        value = getattr(info, name, None)
+        if value is None:
+            continue
+        if isinstance(value, (int, bool)):
+            ext[name] = {"kind": "int", "value": int(value)}
+        elif isinstance(value, float):
+            if math.isfinite(value):
+                ext[name] = {"kind": "double", "value": float(value)}
+        else:
+            ext[name] = {"kind": "text", "value": [str(value)]}
 
     return ext
 
 
-def build_case(filename, source_tests):
+def parse_fixture(filename):
     abs_path = os.path.join(DATA_DIR, filename)
-    case = {
-        "caseId": os.path.splitext(filename)[0],
-        "sourcePythonTest": sorted(set(source_tests)),
-        "inputFile": filename,
-        "expectedFormat": format_from_filename(filename),
+    result = {
         "expectedCoreInfo": {
             "length": None,
             "bitrate": None,
@@ -274,57 +332,172 @@ def build_case(filename, source_tests):
     }
 
     try:
-        audio = mutagen.File(abs_path)
+        with open(abs_path, "rb", buffering=_READ_BUFFERING) as f:
+            audio = _mutagen().File(fileobj=f, filename=abs_path)
     except Exception as exc:
-        case["expectedError"] = {
+        result["expectedError"] = {
             "code": "invalidHeader",
             "message": str(exc),
         }
-        return case
+        return result
 
     if audio is None:
-        case["expectedError"] = {
+        result["expectedError"] = {
             "code": "unsupportedFormat",
             "message": "mutagen returned None",
         }
-        return case
+        return result
 
     info = getattr(audio, "info", None)
     if info is not None:
-        case["expectedCoreInfo"]["length"] = safe_number(getattr(info, "length", None))
-        case["expectedCoreInfo"]["bitrate"] = safe_number(getattr(info, "bitrate", None))
-        case["expectedCoreInfo"]["sampleRate"] = safe_number(getattr(info, "sample_rate", None))
-        case["expectedCoreInfo"]["channels"] = safe_number(getattr(info, "channels", None))
-        case["expectedCoreInfo"]["bitsPerSample"] = safe_number(getattr(info, "bits_per_sample", None))
-
-    case["expectedTags"] = collect_tags(audio)
-    case["expectedExtensions"] = collect_extensions(audio)
+        result["expectedCoreInfo"]["length"] = safe_number(getattr(info, "length", None))
+        result["expectedCoreInfo"]["bitrate"] = safe_number(getattr(info, "bitrate", None))
+        result["expectedCoreInfo"]["sampleRate"] = safe_number(getattr(info, "sample_rate", None))
+        result["expectedCoreInfo"]["channels"] = safe_number(getattr(info, "channels", None))
+        result["expectedCoreInfo"]["bitsPerSample"] = safe_number(getattr(info, "bits_per_sample", None))
+
+    result["expectedTags"] = collect_tags(audio)
+    result["expectedExtensions"] = collect_extensions(audio)
+    return result
+
+
+def build_case(filename, source_tests, parsed):
+    case = {
+        "caseId": os.path.splitext(filename)[0],
+        "sourcePythonTest": sorted(set(source_tests)),
+        "inputFile": filename,
+        "expectedFormat": format_from_filename(filename),
+    }
+    case.update(parsed)
     return case
 
 
+def _cache_namespace():
+    # Cached results are only valid for the generator and mutagen sources that
+    # produced them. mutagen comes from a sibling checkout whose code changes
+    # without version bumps, so key on its files rather than version_string.
+    digest = _sha256(usedforsecurity=False)
+    with open(os.path.abspath(__file__), "rb") as f:
+        digest.update(f.read())
+    # find_spec locates the package without executing it, so a fully cached
+    # run never imports mutagen at all.
+    spec = importlib.util.find_spec("mutagen")
+    if spec is None or spec.origin is None:
+        raise SystemExit(f"failed to import mutagen from {MUTAGEN_DIR}: package not found")
+    package_dir = os.path.dirname(os.path.abspath(spec.origin))
+    for root, dirs, names in os.walk(package_dir):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        for name in sorted(names):
+            if not name.endswith(".py"):
+                continue
+            path = os.path.join(root, name)
+            st = os.stat(path)
+            rel = os.path.relpath(path, package_dir)
+            digest.update(f"{rel}\0{st.st_size}\0{st.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _fingerprint(path):
+    # mutagen picks parsers by extension and some error messages embed the
+    # path, so the path is part of the key rather than just the content.
+    st = os.stat(path)
+    with open(path, "rb") as f:
+        head = f.read(65536)
+    head_digest = _sha256(head, usedforsecurity=False).hexdigest()
+    key = f"{path}\0{st.st_size}\0{st.st_mtime_ns}\0{head_digest}"
+    return _sha256(key.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+def _load_cached(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+_INTERNED = {}
+
+
+def _intern_dict(d):
+    # Keyed on insertion-order serialization so that only dicts which would
+    # be written out byte-for-byte identically end up shared.
+    key = json.dumps(d, ensure_ascii=False)
+    return _INTERNED.setdefault(key, d)
+
+
+def _intern_parsed(parsed):
+    # Applied before a result is stored so the duplicate dicts are dropped
+    # right away rather than kept alive alongside the shared copy.
+    parsed["expectedTags"] = _intern_dict(parsed["expectedTags"])
+    parsed["expectedExtensions"] = _intern_dict(parsed["expectedExtensions"])
+    return parsed
+
+
+def _dump(path, obj):
+    # Always the stdlib encoder: float formatting differs between JSON
+    # libraries (orjson writes 1e-05 as 0.00001), and golden bytes must not
+    # depend on what happens to be installed.
+    with open(path, "w", encoding="utf-8") as f:
+        if PRETTY:
+            json.dump(obj, f, indent=2, ensure_ascii=False)
+        else:
+            json.dump(obj, f, separators=(",", ":"), ensure_ascii=False)
+
+
 def main():
     files, mapping = parse_referenced_files()
     if not files:
         raise SystemExit("no referenced fixtures found")
 
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    cache_dir = None
+    if not os.environ.get("GOLDEN_NO_CACHE"):
+        cache_dir = os.path.join(CACHE_DIR, _cache_namespace())
 
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    # Results are keyed by content fingerprint when caching and by filename
+    # otherwise, so a run without the cache never reads fixtures twice.
+    keys = {}
+    results = {}
+    pending = {}
+    for filename in files:
+        if cache_dir is None:
+            keys[filename] = filename
+            pending[filename] = filename
+            continue
+        key = _fingerprint(os.path.join(DATA_DIR, filename))
+        keys[filename] = key
+        cached = _load_cached(os.path.join(cache_dir, f"{key}.json"))
+        if cached is not None:
+            results[key] = _intern_parsed(cached)
+        else:
+            pending[key] = filename
+
+    if pending:
+        with ProcessPoolExecutor() as executor:
+            for key, parsed in zip(pending, executor.map(parse_fixture, pending.values())):
+                if cache_dir is not None:
+                    _dump(os.path.join(cache_dir, f"{key}.json"), parsed)
+                results[key] = _intern_parsed(parsed)
+
+    # files comes back sorted from parse_referenced_files, so appending in
+    # that order leaves every per-format list already sorted by inputFile.
     by_format = defaultdict(list)
     for filename in files:
-        case = build_case(filename, mapping.get(filename, []))
+        parsed = results[keys[filename]]
+        case = build_case(filename, mapping.get(filename, []), parsed)
         by_format[case["expectedFormat"]].append(case)
 
     index = []
     for fmt, cases in sorted(by_format.items()):
-        cases.sort(key=lambda x: x["inputFile"])
         out_name = f"{fmt}.json"
-        out_path = os.path.join(OUTPUT_DIR, out_name)
-        with open(out_path, "w", encoding="utf-8") as f:
-            json.dump({"format": fmt, "cases": cases}, f, indent=2, ensure_ascii=False)
+        _dump(os.path.join(OUTPUT_DIR, out_name), {"format": fmt, "cases": cases})
         index.append({"format": fmt, "file": out_name, "count": len(cases)})
 
-    with open(os.path.join(OUTPUT_DIR, "index.json"), "w", encoding="utf-8") as f:
-        json.dump({"files": index}, f, indent=2, ensure_ascii=False)
+    _dump(os.path.join(OUTPUT_DIR, "index.json"), {"files": index})
 
     print(f"generated {sum(x['count'] for x in index)} cases across {len(index)} files")
 